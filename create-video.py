@@ -28,11 +28,22 @@ Example folder structure:
 """
 
 import argparse
+import contextlib
 import os
+import re
 import shutil
 import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import NamedTuple
+
+from kokoro_utils import get_pipeline
+
+try:
+    import soundfile as sf  # only needed for TTS output and WAV header reads
+except ImportError:
+    sf = None
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -42,11 +53,43 @@ FRAME_DURATION = 2  # seconds per screenshot (images without audio)
 KOKORO_VOICE = "am_liam" # NOTE: Originally we had 'bm_daniel' here.
 SAMPLE_RATE = 24000  # Kokoro TTS output sample rate
 
+# x264 preset for the per-image segments. They are throwaway intermediates
+# (the final concat stream-copies them) showing a static frame, so the slow
+# presets' motion search buys nothing — ultrafast keeps CRF 18 quality.
+SEGMENT_PRESET = "ultrafast"
+
+# Frame rate of the per-image segments. A held still needs no more than one
+# frame per second; every segment is an all-keyframe stream at this rate in
+# MPEG-TS (fixed 90 kHz clock), so the final concat can stream-copy them.
+SEGMENT_FPS = 1
+
+# Max segments encoded by one ffmpeg process. Every output in a batch keeps
+# its own x264 encoder open, so this bounds memory and how many segments a
+# single failure takes down. Batches are also capped at the thread budget
+# (see build_segments) so one encoder thread per segment stays within it.
+SEGMENT_BATCH_SIZE = 8
+
 # When True: use all available CPU cores (fastest, but loud fans).
 # When False: cap threads at MAX_THREADS for a quieter, cooler run.
 HIGH_PERFORMANCE = False
 MAX_THREADS = 4     # max CPU threads used when HIGH_PERFORMANCE is False
 
+# Whether one ffmpeg process encodes its outputs concurrently (FFmpeg 7.0+
+# runs each in its own thread; older releases encode them one at a time from
+# a single main loop).  main() sets this from ffmpeg_major_version().
+FFMPEG_CONCURRENT_OUTPUTS = False
+
+# JIT applied to the Kokoro model: "none" (eager) or "compile" (torch.compile).
+# The first synthesis pays a one-off cost, later ones skip Python dispatch.
+# (TorchScript is not offered: KModel takes a str, uses lambdas and returns a
+# dataclass, none of which torch.jit.script can compile.)
+KOKORO_JIT = "none"
+
+# Precision for Kokoro inference: "fp32", "bf16" (CPU autocast to bfloat16,
+# roughly halving memory traffic on hosts with native BF16 support) or
+# "auto" (bf16 only when the CPU reports AVX-512 BF16).
+KOKORO_DTYPE = "fp32"
+
 # ANSI colours
 GREEN = "\033[0;32m"
 YELLOW = "\033[1;33m"
@@ -61,43 +104,111 @@ NC = "\033[0m"  # no colour / reset
 def human_readable_size(path: Path) -> str:
     """Return a human-readable file size string (e.g. '1.2M', '340K')."""
     size = path.stat().st_size
-    for unit in ("B", "K", "M", "G", "T"):
-        if size < 1024:
-            if unit == "B":
-                return f"{size}{unit}"
-            return f"{size:.1f}{unit}"
-        size /= 1024
-    return f"{size:.1f}P"
+    # bit_length picks the 1024-power unit directly instead of dividing in a loop.
+    i = min(5, max(0, (size.bit_length() - 1) // 10))
+    if i == 0:
+        return f"{size}B"
+    return f"{size / (1 << (10 * i)):.1f}{'BKMGTP'[i]}"
+
+
+def ffmpeg_major_version() -> int | None:
+    """Return the installed ffmpeg's major version, or None if unknown.
+
+    Parses ``ffmpeg -version`` ("ffmpeg version 6.1.1-3ubuntu5 ...",
+    "ffmpeg version n7.0 ..."); git snapshot builds report no number.
+    """
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-version"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    match = re.match(r"ffmpeg version n?(\d+)\.", result.stdout)
+    return int(match.group(1)) if match else None
+
+
+def _ffmpeg_threads_per_invocation(n_workers: int) -> int:
+    """Return the ``-threads`` value that lets *n_workers* ffmpegs share the CPU.
+
+    Keeps workers × threads at or below the core count so concurrent encodes
+    don't oversubscribe the machine and lose time to context switching.
+    """
+    return max(1, (os.cpu_count() or n_workers) // n_workers)
+
+
+def output_thread_args(threads: int | None = None) -> list[str]:
+    """Return the ``-threads`` option for one ffmpeg output's encoders.
+
+    ``-threads`` is a per-file codec option, not a global cap: it must sit in
+    each output's option group (after the inputs, before the output path) to
+    reach the encoder.  *threads* sets an explicit value (used when several
+    encodes run side by side).  Otherwise, when HIGH_PERFORMANCE is False the
+    cap is MAX_THREADS, keeping CPU load (and fan noise) low, and when
+    HIGH_PERFORMANCE is True the encoder picks its own thread count.
+    """
+    if threads is None and not HIGH_PERFORMANCE:
+        threads = MAX_THREADS
+    return [] if threads is None else ["-threads", str(threads)]
 
 
 def run_ffmpeg(args: list[str], *, capture_filter: str | None = None) -> None:
     """Run an ffmpeg command, optionally filtering stdout+stderr.
 
-    When HIGH_PERFORMANCE is False the global ``-threads`` flag is prepended
-    so every encode is capped at MAX_THREADS, keeping CPU load (and fan noise)
-    low.  When HIGH_PERFORMANCE is True ffmpeg uses all available cores.
+    Callers put output_thread_args() in front of each output path to bound
+    the encoder threads.
     """
-    # -threads N must come before any input/output flags to act as a global cap.
-    thread_args = [] if HIGH_PERFORMANCE else ["-threads", str(MAX_THREADS)]
     if capture_filter is not None:
-        result = subprocess.run(
-            ["ffmpeg"] + thread_args + args,
+        # Read the output line by line while ffmpeg runs, so progress shows up
+        # live and a long encode can never stall on a full pipe buffer.
+        tokens = capture_filter.split("|")
+        with subprocess.Popen(
+            ["ffmpeg"] + args,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
             text=True,
-        )
-        for line in result.stdout.splitlines():
-            if any(tok in line for tok in capture_filter.split("|")):
-                print(line)
+            bufsize=1,
+        ) as proc:
+            assert proc.stdout is not None
+            for line in proc.stdout:
+                if any(tok in line for tok in tokens):
+                    print(line, end="", flush=True)
     else:
+        # Only errors are kept, so a failure can say what went wrong without
+        # buffering ffmpeg's whole progress log.
         subprocess.run(
-            ["ffmpeg"] + thread_args + args,
+            ["ffmpeg", "-loglevel", "error"] + args,
             stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
             check=True,
         )
 
 
+def collect_media_files(directory: Path, valid_extensions: set[str]) -> list[Path]:
+    """Return the media files directly inside *directory*, sorted by name.
+
+    Uses a single ``os.scandir`` pass; its entries carry cached file-type
+    info, so no per-file ``stat`` call is needed to filter them.
+    """
+    with os.scandir(directory) as it:
+        entries = [
+            e
+            for e in it
+            if e.is_file()
+            and Path(e.name).suffix.lower() in valid_extensions
+            and "generated-wav" not in Path(e.path).parts
+        ]
+    return sorted((Path(e.path) for e in entries), key=lambda p: p.name)
+
+
+def is_screenshot(path: Path) -> bool:
+    """Return True if *path* is a screenshot (``.png``, in any letter case).
+
+    The MP4 and GIF passes both use this, so they always agree on the frames.
+    """
+    return path.suffix.lower() == ".png"
+
+
 def get_audio_duration(audio_path: Path) -> float | None:
     """Return audio duration in seconds via ffprobe, or None on failure."""
     result = subprocess.run(
@@ -119,63 +230,83 @@ def get_audio_duration(audio_path: Path) -> float | None:
         return None
 
 
+def get_audio_durations(paths: list[Path]) -> dict[Path, float | None]:
+    """Return the duration of every audio file in *paths*, keyed by path.
+
+    WAV headers are read with soundfile and MP3 headers with mutagen, both
+    in-process, so the common case spawns no subprocess at all.  ffprobe is
+    only used for a file when its reader is not installed or fails on it.
+    """
+    try:
+        from mutagen.mp3 import MP3  # type: ignore[import-untyped]
+    except ImportError:
+        MP3 = None
+
+    durations: dict[Path, float | None] = {}
+    for path in paths:
+        duration: float | None = None
+        try:
+            if path.suffix.lower() == ".wav" and sf is not None:
+                duration = sf.info(str(path)).duration
+            elif path.suffix.lower() == ".mp3" and MP3 is not None:
+                duration = MP3(str(path)).info.length
+        except Exception:
+            duration = None  # unreadable header; let ffprobe have a go
+        durations[path] = duration if duration else get_audio_duration(path)
+    return durations
+
+
 # ---------------------------------------------------------------------------
 # Kokoro TTS (in-process)
 # ---------------------------------------------------------------------------
 
-# Voice prefix -> language code mapping (mirrors kokoro-generate.py)
-_LANG_CODE_MAP = {
-    "a": "a",  # American English
-    "b": "b",  # British English
-    "e": "e",  # Spanish
-    "f": "f",  # French
-    "h": "h",  # Hindi
-    "i": "i",  # Italian
-    "j": "j",  # Japanese
-    "p": "p",  # Portuguese
-    "z": "z",  # Mandarin Chinese
-}
-
 # Lazy-loaded pipeline — only initialised when TTS is actually needed.
 _kokoro_pipeline = None
+# Voice pack for KOKORO_VOICE, loaded once alongside the pipeline so each
+# synthesis call reuses the tensor instead of resolving the voice again.
+_kokoro_voice_pack = None
+# Whether inference runs under bfloat16 autocast (resolved from KOKORO_DTYPE).
+_kokoro_bf16 = False
+# Where the unpacked voice pack is cached between runs (set by main()).
+_voice_cache_dir: Path | None = None
 
 
-def _detect_lang_code(voice: str) -> str:
-    """Detect language code from voice name prefix."""
-    if voice and len(voice) >= 2:
-        first_char = voice[0]
-        if first_char in _LANG_CODE_MAP:
-            return _LANG_CODE_MAP[first_char]
-    return "a"
-
-
-def _ensure_kokoro_pipeline() -> None:
-    """Lazily initialise the Kokoro TTS pipeline."""
-    global _kokoro_pipeline  # noqa: PLW0603
-    if _kokoro_pipeline is not None:
-        return
+def _configure_native_env() -> None:
+    """Set the environment variables the Kokoro stack reads when it loads.
 
+    Forces offline mode and, when HIGH_PERFORMANCE is False, caps PyTorch /
+    OpenMP / MKL parallelism at MAX_THREADS.  Native libraries only read these
+    once, as they load, so main() calls this before anything imports torch.
+    """
     # Force fully offline mode — never contact HuggingFace Hub.
     os.environ["HF_HUB_OFFLINE"] = "1"
 
     if not HIGH_PERFORMANCE:
-        # Limit CPU parallelism for PyTorch / OpenMP / MKL so the TTS inference
-        # stays within MAX_THREADS and doesn't spin up every core.
-        # These env vars must be set before the native extensions are loaded,
-        # which is why they live here rather than at module level.
         thread_str = str(MAX_THREADS)
         os.environ.setdefault("OMP_NUM_THREADS", thread_str)
         os.environ.setdefault("MKL_NUM_THREADS", thread_str)
         os.environ.setdefault("OPENBLAS_NUM_THREADS", thread_str)
+
+
+def _ensure_kokoro_pipeline() -> None:
+    """Lazily initialise the Kokoro TTS pipeline."""
+    global _kokoro_pipeline, _kokoro_voice_pack, _kokoro_bf16  # noqa: PLW0603
+    if _kokoro_pipeline is not None:
+        return
+
+    if not HIGH_PERFORMANCE:
+        # Keep TTS inference within MAX_THREADS rather than every core.
         try:
             import torch  # type: ignore[import-untyped]
             torch.set_num_threads(MAX_THREADS)
             torch.set_num_interop_threads(MAX_THREADS)
         except Exception:
-            pass  # torch not available; Kokoro will still respect the env vars above
+            pass  # torch not available; Kokoro will still respect _configure_native_env
 
     try:
-        from kokoro import KPipeline  # type: ignore[import-untyped]
+        _kokoro_pipeline, _kokoro_voice_pack = get_pipeline(
+            KOKORO_VOICE, cache_dir=_voice_cache_dir
+        )
     except ImportError:
         print(
             f"{RED}✗ kokoro package not installed in current environment{NC}",
@@ -188,14 +319,79 @@ def _ensure_kokoro_pipeline() -> None:
         )
         sys.exit(1)
 
-    lang_code = _detect_lang_code(KOKORO_VOICE)
-    _kokoro_pipeline = KPipeline(lang_code=lang_code)
+    if KOKORO_DTYPE != "fp32":
+        import torch  # type: ignore[import-untyped]
+
+        # torch.cpu._is_avx512_bf16_supported only exists on newer torch builds.
+        bf16_check = getattr(torch.cpu, "_is_avx512_bf16_supported", lambda: False)
+        _kokoro_bf16 = KOKORO_DTYPE == "bf16" or bf16_check()
+        if _kokoro_bf16:
+            torch.set_float32_matmul_precision("medium")
+
+    if KOKORO_JIT != "none":
+        _jit_kokoro_model()
+
+
+def _jit_kokoro_model() -> None:
+    """Apply KOKORO_JIT to the Kokoro model, falling back to eager on failure.
+
+    Only KModel.forward_with_tokens is compiled: forward() takes the phoneme
+    str, which Dynamo would treat as a constant and recompile for on every new
+    chunk.  dynamic=True keeps one graph across chunk lengths, so the short
+    warm-up sentence below really does pay the compile cost up front.  Any
+    compile error, during warm-up or a later call, switches back to eager.
+    """
+    model = _kokoro_pipeline.model
+    eager = model.forward_with_tokens
+
+    def fall_back(e: Exception) -> None:
+        # Drop the instance override to get the eager method back.
+        model.__dict__.pop("forward_with_tokens", None)
+        print(
+            f"{YELLOW}⚠ --jit {KOKORO_JIT} failed ({e}); using eager Kokoro model{NC}",
+            file=sys.stderr,
+        )
+
+    try:
+        import torch  # type: ignore[import-untyped]
+
+        # fullgraph=True fails on Kokoro's model; graph breaks are fine here.
+        compiled = torch.compile(eager, dynamic=True, fullgraph=False)
+    except Exception as e:
+        fall_back(e)
+        return
+
+    def forward_with_tokens(*args, **kwargs):
+        try:
+            return compiled(*args, **kwargs)
+        except Exception as e:
+            fall_back(e)
+            return eager(*args, **kwargs)
+
+    model.forward_with_tokens = forward_with_tokens
+    with _kokoro_autocast():
+        for _ in _kokoro_pipeline("Warming up.", voice=_kokoro_voice_pack):
+            pass
+
+
+def _kokoro_autocast():
+    """Return the context to run Kokoro inference in (bf16 autocast or a no-op).
+
+    Autocast rather than casting the model to bfloat16: the pipeline feeds
+    float32 voice-pack tensors into the model, which a bf16-only model rejects.
+    """
+    if not _kokoro_bf16:
+        return contextlib.nullcontext()
+    import torch  # type: ignore[import-untyped]
+    return torch.autocast("cpu", dtype=torch.bfloat16)
 
 
 def run_kokoro_tts(input_txt: Path, output_wav: Path) -> None:
     """Generate a WAV file from a text file using Kokoro TTS (in-process)."""
-    import numpy as np  # imported here so numpy isn't required when no TTS is used
-    import soundfile as sf
+    if sf is None:
+        print(f"{RED}✗ soundfile package not installed in current environment{NC}", file=sys.stderr)
+        print("Install with: pip install soundfile", file=sys.stderr)
+        sys.exit(1)
 
     _ensure_kokoro_pipeline()
 
@@ -204,18 +400,70 @@ def run_kokoro_tts(input_txt: Path, output_wav: Path) -> None:
         print(f"{RED}✗ Narration file is empty: {input_txt.name}{NC}", file=sys.stderr)
         sys.exit(1)
 
-    audio_chunks: list = []
-    for _gs, _ps, audio in _kokoro_pipeline(
-        text, voice=KOKORO_VOICE, speed=1.0, split_pattern=r"\n+"
-    ):
-        audio_chunks.append(audio)
-
-    if not audio_chunks:
+    # Stream each chunk straight to disk rather than collecting and
+    # concatenating them, so long narrations never hold a second full copy.
+    # Write to a temp name and rename on success: an interrupted run must not
+    # leave a truncated WAV that the cache check would later reuse.
+    tmp_wav = output_wav.with_name(f"{output_wav.stem}.{os.getpid()}.tmp.wav")
+    frames_written = 0
+    try:
+        with sf.SoundFile(
+            str(tmp_wav), "w", samplerate=SAMPLE_RATE, channels=1, subtype="PCM_16"
+        ) as out, _kokoro_autocast():
+            for _gs, _ps, audio in _kokoro_pipeline(
+                text, voice=_kokoro_voice_pack, speed=1.0, split_pattern=r"\n+"
+            ):
+                # soundfile can't take bfloat16, so always hand it float32 samples.
+                out.write(audio.float().cpu().numpy() if hasattr(audio, "cpu") else audio)
+                frames_written += len(audio)
+    except BaseException:
+        tmp_wav.unlink(missing_ok=True)
+        raise
+
+    if frames_written == 0:
+        tmp_wav.unlink(missing_ok=True)
         print(f"{RED}✗ No audio generated for: {input_txt.name}{NC}", file=sys.stderr)
         sys.exit(1)
-
-    full_audio = np.concatenate(audio_chunks)
-    sf.write(str(output_wav), full_audio, SAMPLE_RATE)
+    os.replace(tmp_wav, output_wav)
+
+
+def _tts_worker(
+    input_txt: Path,
+    output_wav: Path,
+    voice: str,
+    max_threads: int,
+    *,
+    jit: str,
+    dtype: str,
+    voice_cache_dir: Path | None,
+    high_performance: bool,
+) -> None:
+    """Process-pool entry point: run_kokoro_tts in a worker process.
+
+    Every setting main() applies to module globals is passed in and re-applied
+    here, since a spawned (not forked) worker starts from the module defaults.
+    The thread limits are set before this process first imports kokoro (and
+    with it torch), so each worker stays within its *max_threads* share.
+    """
+    global KOKORO_VOICE, MAX_THREADS, KOKORO_JIT, KOKORO_DTYPE  # noqa: PLW0603
+    global _voice_cache_dir, HIGH_PERFORMANCE  # noqa: PLW0603
+    KOKORO_VOICE = voice
+    MAX_THREADS = max_threads
+    KOKORO_JIT = jit
+    KOKORO_DTYPE = dtype
+    _voice_cache_dir = voice_cache_dir
+    HIGH_PERFORMANCE = high_performance
+    _configure_native_env()
+    thread_str = str(max_threads)
+    os.environ["OMP_NUM_THREADS"] = thread_str
+    os.environ["MKL_NUM_THREADS"] = thread_str
+    os.environ["OPENBLAS_NUM_THREADS"] = thread_str
+    try:
+        import torch  # type: ignore[import-untyped]
+        torch.set_num_threads(max_threads)
+    except Exception:
+        pass  # torch not available; Kokoro will still respect the env vars above
+    run_kokoro_tts(input_txt, output_wav)
 
 
 # ---------------------------------------------------------------------------
@@ -223,34 +471,133 @@ def run_kokoro_tts(input_txt: Path, output_wav: Path) -> None:
 # ---------------------------------------------------------------------------
 
 
-def build_silent_segment(image: Path, segment: Path) -> None:
-    """Create a video segment from a still image with silent audio."""
-    run_ffmpeg([
-        "-y",
-        "-loop", "1", "-i", str(image),
-        "-f", "lavfi", "-i", "anullsrc=r=44100:cl=stereo",
-        "-t", str(FRAME_DURATION),
-        "-c:v", "libx264", "-preset", "slow", "-crf", "18",
-        "-vf", "scale=trunc(iw/2)*2:trunc(ih/2)*2,format=yuv420p",
-        "-c:a", "aac", "-b:a", "128k",
-        "-shortest",
-        str(segment),
-    ])
+class SegmentJob(NamedTuple):
+    """One intermediate segment: *image* held on screen for *duration* seconds."""
+
+    image: Path
+    audio: Path | None  # None for a silent segment
+    segment: Path
+    duration: float
 
 
-def build_audio_segment(image: Path, audio: Path, segment: Path) -> None:
-    """Create a video segment holding *image* on screen for the duration of *audio*."""
-    run_ffmpeg([
-        "-y",
-        "-loop", "1", "-i", str(image),
-        "-i", str(audio),
-        "-c:v", "libx264", "-preset", "slow", "-crf", "18",
+def _segment_args(
+    job: SegmentJob, first_input: int, threads: int | None = None
+) -> tuple[list[str], list[str]]:
+    """Return (input args, output args) that build one segment.
+
+    The job's two inputs get ffmpeg input indices *first_input* and
+    *first_input* + 1.  The looped image (and the silence source) are cut to
+    the duration at the input, so every input ends.  *threads* caps this
+    output's encoders (see output_thread_args).
+
+    At SEGMENT_FPS the last video frame can overhang the job's duration by up
+    to a frame, so the audio is padded and cut to exactly that duration here,
+    and the concat list pins each segment's length to it (see
+    _concat_entry).  Neither stream then drifts from the slide timeline.
+    """
+    image, audio, segment, duration = job
+    input_args = [
+        "-loop", "1", "-framerate", str(SEGMENT_FPS), "-t", str(duration),
+        "-i", str(image),
+    ]
+    if audio is None:
+        input_args += ["-f", "lavfi", "-t", str(duration), "-i", "anullsrc=r=44100:cl=stereo"]
+        audio_args = []
+    else:
+        input_args += ["-i", str(audio)]
+        # apad + -t: a probed duration a hair longer than the real audio is
+        # filled with silence instead of leaving a gap.
+        audio_args = ["-af", "apad", "-ar", "44100", "-ac", "2"]
+
+    output_args = [
+        "-map", f"{first_input}:v", "-map", f"{first_input + 1}:a",
+        "-c:v", "libx264", "-preset", SEGMENT_PRESET, "-tune", "stillimage", "-crf", "18",
+        "-r", str(SEGMENT_FPS), "-g", "1", "-keyint_min", "1",
         "-vf", "scale=trunc(iw/2)*2:trunc(ih/2)*2,format=yuv420p",
-        "-ar", "44100", "-ac", "2",
+        *audio_args,
         "-c:a", "aac", "-b:a", "128k",
-        "-shortest",
+        "-t", str(duration),
+        # MPEG-TS has no moov atom to finalise per segment and concatenates
+        # cleanly at packet boundaries.
+        "-f", "mpegts", "-bsf:v", "h264_mp4toannexb",
+        *output_thread_args(threads),
         str(segment),
-    ])
+    ]
+    return input_args, output_args
+
+
+def concat_file_line(path: Path) -> str:
+    """Return a concat-demuxer ``file`` line for *path*, quoted for its parser.
+
+    The demuxer reads single-quoted strings like a shell, so an embedded
+    ``'`` must close the quote, be escaped, and reopen it (``'\\''``).
+    """
+    quoted = str(path.resolve()).replace("'", "'\\''")
+    return f"file '{quoted}'\n"
+
+
+def _concat_entry(job: SegmentJob) -> str:
+    """Return the concat-demuxer lines for one segment, pinned to its duration.
+
+    The explicit ``duration`` makes the next segment start exactly where this
+    one's audio ends, even though its last 1 fps frame nominally runs past it.
+    """
+    return f"{concat_file_line(job.segment)}duration {job.duration}\n"
+
+
+def batch_segment_jobs(
+    jobs: list[SegmentJob], threads: int | None = None
+) -> list[list[SegmentJob]]:
+    """Split *jobs* into in-order batches, one ffmpeg process each.
+
+    *threads* is each process's thread budget (None: HIGH_PERFORMANCE auto,
+    else MAX_THREADS when not given).  Batches hold at most
+    SEGMENT_BATCH_SIZE jobs.  When FFMPEG_CONCURRENT_OUTPUTS, they also hold
+    no more jobs than the budget, so the encoders running side by side can
+    each get at least one thread without exceeding it.
+    """
+    if threads is None and not HIGH_PERFORMANCE:
+        threads = MAX_THREADS
+    size = SEGMENT_BATCH_SIZE
+    if threads is not None and FFMPEG_CONCURRENT_OUTPUTS:
+        size = min(size, threads)
+    return [jobs[i:i + size] for i in range(0, len(jobs), size)]
+
+
+def build_segments(jobs: list[SegmentJob], threads: int | None = None) -> None:
+    """Encode every segment in *jobs* with a single ffmpeg process.
+
+    Each segment is a separate output of the same command, so ffmpeg's
+    startup is paid once per batch rather than per segment.  *threads* is
+    the whole process's budget (None: MAX_THREADS, or auto when
+    HIGH_PERFORMANCE).  Before FFmpeg 7.0 the outputs are encoded one after
+    another, so each encoder gets the whole budget; only when
+    FFMPEG_CONCURRENT_OUTPUTS is the budget split evenly across them.
+    """
+    if threads is None and not HIGH_PERFORMANCE:
+        threads = MAX_THREADS
+    per_output = threads
+    if threads is not None and FFMPEG_CONCURRENT_OUTPUTS:
+        per_output = max(1, threads // len(jobs))
+
+    input_args: list[str] = []
+    output_args: list[str] = []
+    for k, job in enumerate(jobs):
+        job_inputs, job_outputs = _segment_args(job, 2 * k, per_output)
+        input_args += job_inputs
+        output_args += job_outputs
+    try:
+        run_ffmpeg(["-y", *input_args, *output_args])
+    except subprocess.CalledProcessError as e:
+        sources = ", ".join((job.audio or job.image).name for job in jobs)
+        print(
+            f"\n{RED}✗ ffmpeg failed building {jobs[0].segment.name}"
+            f"..{jobs[-1].segment.name} ({sources}){NC}",
+            file=sys.stderr,
+        )
+        if e.stderr:
+            print(e.stderr.strip(), file=sys.stderr)
+        sys.exit(1)
 
 
 # ---------------------------------------------------------------------------
@@ -259,7 +606,8 @@ def build_audio_segment(image: Path, audio: Path, segment: Path) -> None:
 
 
 def main() -> None:
-    global MAX_THREADS  # noqa: PLW0603
+    global MAX_THREADS, SEGMENT_PRESET, KOKORO_JIT, KOKORO_DTYPE, _voice_cache_dir  # noqa: PLW0603
+    global FFMPEG_CONCURRENT_OUTPUTS  # noqa: PLW0603
 
     # --- Argument parsing ---------------------------------------------------
     parser = argparse.ArgumentParser(
@@ -280,11 +628,60 @@ def main() -> None:
         metavar="N",
         help=f"Max CPU threads for ffmpeg and Kokoro TTS (default: {MAX_THREADS})",
     )
+    parser.add_argument(
+        "--parallel-encodes",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Max video segments to encode concurrently (default: 1, one at a time)",
+    )
+    parser.add_argument(
+        "--parallel-tts",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Max narration files to synthesise concurrently, one process each "
+        "(default: 1, one at a time)",
+    )
+    parser.add_argument(
+        "--ffmpeg-threads-per-invocation",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Override the -threads value of each segment encode, clamped to 1-64 "
+        "(default: CPU count / parallel encodes)",
+    )
+    parser.add_argument(
+        "--preset",
+        default=SEGMENT_PRESET,
+        choices=[
+            "ultrafast", "superfast", "veryfast", "faster", "fast",
+            "medium", "slow", "slower", "veryslow",
+        ],
+        help=f"x264 preset for the per-image segments (default: {SEGMENT_PRESET})",
+    )
+    parser.add_argument(
+        "--jit",
+        default=KOKORO_JIT,
+        choices=["none", "compile"],
+        help="JIT the Kokoro model with torch.compile "
+        f"(slower first narration, faster after; default: {KOKORO_JIT})",
+    )
+    parser.add_argument(
+        "--dtype",
+        default=KOKORO_DTYPE,
+        choices=["fp32", "bf16", "auto"],
+        help="Kokoro inference precision; auto picks bf16 on AVX-512 BF16 CPUs "
+        f"(default: {KOKORO_DTYPE})",
+    )
     args = parser.parse_args()
+    SEGMENT_PRESET = args.preset
+    KOKORO_JIT = args.jit
+    KOKORO_DTYPE = args.dtype
 
     if not HIGH_PERFORMANCE:
-        # Apply the thread limit globally so run_ffmpeg and _ensure_kokoro_pipeline
-        # both pick up the (potentially overridden) value.
+        # Apply the thread limit globally so output_thread_args and
+        # _ensure_kokoro_pipeline both pick up the (potentially overridden) value.
         MAX_THREADS = args.threads
 
         # Lower process scheduling priority so the OS yields to other tasks first,
@@ -294,6 +691,8 @@ def main() -> None:
         except (AttributeError, PermissionError):
             pass  # os.nice is not available on all platforms
 
+    _configure_native_env()
+
     base_folder = args.base_folder
     subfolder_name = args.subfolder_name
 
@@ -311,11 +710,12 @@ def main() -> None:
     output_dir = base_path / "test-videos"
     mp4_file = output_dir / f"{subfolder_name}.mp4"
     gif_file = output_dir / f"{subfolder_name}.gif"
-    palette_file = output_dir / f"{subfolder_name}-palette.png"
     segment_dir = output_dir / f"{subfolder_name}-segments"
     concat_list = segment_dir / "concat-list.txt"
+    gif_concat_list = segment_dir / "gif-concat.txt"
     generated_wav_dir = screenshot_dir / "generated-wav"
     intro_generated_wav_dir = intro_dir / "generated-wav"
+    _voice_cache_dir = generated_wav_dir / ".voice-cache"
 
     print(f"{YELLOW}=== Create Video from Screenshots ==={NC}")
     print()
@@ -329,6 +729,7 @@ def main() -> None:
         print(f"{RED}✗ ffprobe is not installed (usually ships with ffmpeg){NC}")
         print("Install with: sudo apt install ffmpeg")
         sys.exit(1)
+    FFMPEG_CONCURRENT_OUTPUTS = (ffmpeg_major_version() or 0) >= 7
 
     # --- Verify screenshot directory ----------------------------------------
     if not screenshot_dir.is_dir():
@@ -338,13 +739,7 @@ def main() -> None:
 
     # --- Collect and sort media files ---------------------------------------
     valid_extensions = {".png", ".mp3", ".wav", ".txt"}
-    main_files: list[Path] = sorted(
-        f
-        for f in screenshot_dir.iterdir()
-        if f.is_file()
-        and f.suffix.lower() in valid_extensions
-        and "generated-wav" not in f.parts
-    )
+    main_files = collect_media_files(screenshot_dir, valid_extensions)
 
     if not main_files:
         print(f"{RED}✗ No .png, .mp3, .wav, or .txt files found in {screenshot_dir}/{NC}")
@@ -354,13 +749,7 @@ def main() -> None:
     intro_files: list[Path] = []
     use_intro = not args.no_intro and intro_dir.is_dir()
     if use_intro:
-        intro_files = sorted(
-            f
-            for f in intro_dir.iterdir()
-            if f.is_file()
-            and f.suffix.lower() in valid_extensions
-            and "generated-wav" not in f.parts
-        )
+        intro_files = collect_media_files(intro_dir, valid_extensions)
         if intro_files:
             print(f"Intro folder found: {intro_dir}/")
             print(f"  Prepending {len(intro_files)} intro file(s) to MP4 (skipped for GIF)")
@@ -372,9 +761,9 @@ def main() -> None:
     media_files: list[Path] = intro_files + main_files
 
     # --- Count by type ------------------------------------------------------
-    image_count = sum(1 for f in media_files if f.suffix == ".png")
-    audio_count = sum(1 for f in media_files if f.suffix in {".mp3", ".wav"})
-    tts_count = sum(1 for f in media_files if f.suffix == ".txt")
+    image_count = sum(1 for f in media_files if is_screenshot(f))
+    audio_count = sum(1 for f in media_files if f.suffix.lower() in {".mp3", ".wav"})
+    tts_count = sum(1 for f in media_files if f.suffix.lower() == ".txt")
 
     if image_count == 0:
         print(f"{RED}✗ No .png screenshots found in {screenshot_dir}/{NC}")
@@ -382,7 +771,7 @@ def main() -> None:
         sys.exit(1)
 
     first_file = media_files[0]
-    if first_file.suffix != ".png":
+    if not is_screenshot(first_file):
         print(f"{RED}✗ First file must be a .png screenshot, got: {first_file.name}{NC}")
         print("Audio clips need a preceding screenshot to display.")
         sys.exit(1)
@@ -395,8 +784,9 @@ def main() -> None:
         )
 
         converted_files: list[Path] = []
+        pending_tts: list[tuple[Path, Path]] = []  # (txt, wav) pairs missing from the cache
         for f in media_files:
-            if f.suffix == ".txt":
+            if f.suffix.lower() == ".txt":
                 # Use the appropriate generated-wav/ cache dir for the source file
                 if use_intro and f.parent == intro_dir:
                     wav_cache_dir = intro_generated_wav_dir
@@ -415,15 +805,49 @@ def main() -> None:
                         f"  [{txt_basename}.txt] {GREEN}cached{NC} → {txt_basename}.wav"
                     )
                 else:
-                    print(f"  [{txt_basename}.txt] generating WAV ... ", end="", flush=True)
-                    run_kokoro_tts(f, wav_path)
-                    print(f"{GREEN}✓{NC}")
+                    pending_tts.append((f, wav_path))
 
                 converted_files.append(wav_path)
                 audio_count += 1
             else:
                 converted_files.append(f)
 
+        # Each worker runs its own Kokoro model with MAX_THREADS threads, so
+        # only start as many as the machine has cores for.
+        n_tts_workers = min(
+            max(1, args.parallel_tts),
+            max(1, (os.cpu_count() or 4) // MAX_THREADS),
+            max(1, len(pending_tts)),
+        )
+
+        if n_tts_workers == 1:
+            for f, wav_path in pending_tts:
+                print(f"  [{f.name}] generating WAV ... ", end="", flush=True)
+                run_kokoro_tts(f, wav_path)
+                print(f"{GREEN}✓{NC}")
+        else:
+            print(f"  Generating {len(pending_tts)} WAV(s) with {n_tts_workers} TTS processes...")
+            # Processes rather than threads: Kokoro's G2P frontend holds the GIL.
+            with ProcessPoolExecutor(max_workers=n_tts_workers) as pool:
+                futures = {
+                    pool.submit(
+                        _tts_worker,
+                        f,
+                        wav_path,
+                        KOKORO_VOICE,
+                        MAX_THREADS,
+                        jit=KOKORO_JIT,
+                        dtype=KOKORO_DTYPE,
+                        voice_cache_dir=_voice_cache_dir,
+                        high_performance=HIGH_PERFORMANCE,
+                    ): (f, wav_path)
+                    for f, wav_path in pending_tts
+                }
+                for future in as_completed(futures):
+                    future.result()  # re-raise any TTS failure
+                    f, wav_path = futures[future]
+                    print(f"  [{f.name}] {GREEN}✓{NC} → {wav_path.name}")
+
         media_files = converted_files
         print()
 
@@ -438,8 +862,8 @@ def main() -> None:
     gif_file.unlink(missing_ok=True)
 
     # --- Report what we found -----------------------------------------------
-    main_image_count = sum(1 for f in main_files if f.suffix == ".png")
-    intro_image_count = sum(1 for f in intro_files if f.suffix == ".png")
+    main_image_count = sum(1 for f in main_files if is_screenshot(f))
+    intro_image_count = sum(1 for f in intro_files if is_screenshot(f))
     if use_intro and intro_files:
         print(
             f"Found {image_count} screenshot(s) ({intro_image_count} intro + "
@@ -454,53 +878,100 @@ def main() -> None:
         print(f"Total video length: {image_count * FRAME_DURATION}s")
     print()
 
-    # --- Build video segments -----------------------------------------------
-    segment_index = 0
+    # --- Plan video segments ------------------------------------------------
+    # Pass 1 decides what each segment holds and writes the concat list in
+    # order; pass 2 runs the (independent) ffmpeg encodes, optionally split
+    # over parallel processes, so completion order doesn't matter.
+    jobs: list[SegmentJob] = []
     current_image: Path | None = None
     total_duration: float = 0.0
+    audio_durations = get_audio_durations(
+        [f for f in media_files if f.suffix.lower() in {".mp3", ".wav"}]
+    )
 
     with concat_list.open("w", encoding="utf-8") as cl:
         for i, f in enumerate(media_files):
-            segment_file = segment_dir / f"segment-{segment_index:04d}.mp4"
+            segment_file = segment_dir / f"segment-{len(jobs):04d}.ts"
             basename = f.name
 
-            if f.suffix == ".png":
+            if is_screenshot(f):
                 current_image = f
                 # If the very next file is audio, skip the silent segment so
                 # the audio starts immediately over this image (no 2-second
                 # silent hold before the narration begins).
                 next_file = media_files[i + 1] if i + 1 < len(media_files) else None
-                if next_file is not None and next_file.suffix in {".mp3", ".wav"}:
+                if next_file is not None and next_file.suffix.lower() in {".mp3", ".wav"}:
                     print(f"  [{basename}] image (held for next audio, no silent segment)")
                     continue  # don't build a segment; audio pass will pick up current_image
 
-                print(f"  [{basename}] image, {FRAME_DURATION}s ... ", end="", flush=True)
-                build_silent_segment(f, segment_file)
-                print(f"{GREEN}✓{NC}")
+                print(f"  [{basename}] image, {FRAME_DURATION}s")
+                jobs.append(SegmentJob(f, None, segment_file, FRAME_DURATION))
+                cl.write(_concat_entry(jobs[-1]))
                 total_duration += FRAME_DURATION
 
-            elif f.suffix in {".mp3", ".wav"}:
-                audio_duration = get_audio_duration(f)
+            elif f.suffix.lower() in {".mp3", ".wav"}:
+                audio_duration = audio_durations[f]
                 if audio_duration is None:
                     print(f"  [{basename}] {RED}✗ could not detect duration, skipping{NC}")
                     continue
 
                 assert current_image is not None
-                print(
-                    f"  [{basename}] audio, {audio_duration}s "
-                    f"(holding {current_image.name}) ... ",
-                    end="",
-                    flush=True,
-                )
-                build_audio_segment(current_image, f, segment_file)
-                print(f"{GREEN}✓{NC}")
+                print(f"  [{basename}] audio, {audio_duration}s (holding {current_image.name})")
+                jobs.append(SegmentJob(current_image, f, segment_file, audio_duration))
+                cl.write(_concat_entry(jobs[-1]))
                 total_duration += audio_duration
 
-            cl.write(f"file '{segment_file.resolve()}'\n")
-            segment_index += 1
+    # --- Build video segments -----------------------------------------------
+    if not jobs:
+        print(f"{RED}✗ No segments to encode (no usable images or audio){NC}")
+        sys.exit(1)
+
+    # Each ffmpeg process encodes a small batch of segments; with parallel
+    # encodes several batches run at once.
+    n_workers = min(max(1, args.parallel_encodes), os.cpu_count() or 4)
+
+    # Split the CPU between concurrent processes so workers × threads stays
+    # within the core count.  Serial encodes keep the usual cap.
+    segment_threads: int | None = None
+    if args.ffmpeg_threads_per_invocation is not None:
+        segment_threads = min(64, max(1, args.ffmpeg_threads_per_invocation))
+    elif n_workers > 1:
+        segment_threads = _ffmpeg_threads_per_invocation(n_workers)
+        if not HIGH_PERFORMANCE:
+            segment_threads = min(segment_threads, MAX_THREADS)
+
+    batches = batch_segment_jobs(jobs, segment_threads)
+    n_workers = min(n_workers, len(batches))
 
     print()
-    print(f"Generated {segment_index} segments, total duration: ~{round(total_duration)}s")
+    if n_workers == 1:
+        for batch in batches:
+            print(
+                f"  [{batch[0].segment.name}..{batch[-1].segment.name}] ... ",
+                end="",
+                flush=True,
+            )
+            build_segments(batch, segment_threads)
+            print(f"{GREEN}✓{NC}")
+    else:
+        print(
+            f"Encoding {len(jobs)} segments in {len(batches)} batches, {n_workers} "
+            f"ffmpeg processes at a time ({segment_threads} thread(s) each)..."
+        )
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            futures = {
+                pool.submit(build_segments, batch, segment_threads): batch
+                for batch in batches
+            }
+            for future in as_completed(futures):
+                future.result()  # re-raise any ffmpeg failure
+                batch = futures[future]
+                print(
+                    f"  [{batch[0].segment.name}..{batch[-1].segment.name}] {GREEN}✓{NC}"
+                )
+
+    print()
+    print(f"Generated {len(jobs)} segments, total duration: ~{round(total_duration)}s")
     print()
 
     # --- Concatenate segments into final MP4 --------------------------------
@@ -511,7 +982,10 @@ def main() -> None:
             "-f", "concat", "-safe", "0",
             "-i", str(concat_list),
             "-c", "copy",
+            # ADTS AAC from the MPEG-TS segments -> MP4's AudioSpecificConfig
+            "-bsf:a", "aac_adtstoasc",
             "-movflags", "+faststart",
+            *output_thread_args(),
             str(mp4_file),
         ],
         capture_filter="frame=|Duration:|Output|error",
@@ -526,44 +1000,36 @@ def main() -> None:
     print()
 
     # --- Create GIF (images only, no audio support in GIF) ------------------
-    # Collect sorted PNG paths for the GIF (glob pattern isn't reliable with
-    # pathlib across different filenames, so we feed them via concat demuxer).
-    png_files = sorted(screenshot_dir.glob("*.png"))
-
-    print("Generating GIF palette (images only, audio skipped)...")
-    run_ffmpeg(
-        [
-            "-y",
-            "-framerate", f"1/{FRAME_DURATION}",
-            "-pattern_type", "glob",
-            "-i", str(screenshot_dir / "*.png"),
-            "-vf", "palettegen",
-            str(palette_file),
-        ],
-        capture_filter="frame=|Duration:|Output|error",
-    )
-
-    if not palette_file.exists():
-        print(f"{RED}✗ Failed to generate palette{NC}")
+    # Feed the already-sorted screenshots through the concat demuxer rather
+    # than an ffmpeg glob: no second directory scan, and the frame order is
+    # exactly the MP4's (same is_screenshot rule, intro excluded) regardless
+    # of locale or odd filenames.
+    gif_pngs = [f for f in main_files if is_screenshot(f)]
+    if not gif_pngs:
+        print(f"{RED}✗ No .png screenshots in {screenshot_dir}/ to build a GIF from{NC}")
         sys.exit(1)
-
-    print("Creating GIF...")
+    with gif_concat_list.open("w", encoding="utf-8") as gl:
+        for png in gif_pngs:
+            gl.write(f"{concat_file_line(png)}duration {FRAME_DURATION}\n")
+        # The concat demuxer ignores the last entry's duration unless the
+        # file is listed once more.
+        gl.write(concat_file_line(gif_pngs[-1]))
+
+    # palettegen and paletteuse run in one filter graph, so every PNG is
+    # decoded once and no intermediate palette file is written.
+    print("Creating GIF (images only, audio skipped)...")
     run_ffmpeg(
         [
             "-y",
-            "-framerate", f"1/{FRAME_DURATION}",
-            "-pattern_type", "glob",
-            "-i", str(screenshot_dir / "*.png"),
-            "-i", str(palette_file),
-            "-lavfi", "paletteuse",
+            "-f", "concat", "-safe", "0",
+            "-i", str(gif_concat_list),
+            "-filter_complex", "split[a][b];[a]palettegen[p];[b][p]paletteuse",
+            *output_thread_args(),
             str(gif_file),
         ],
         capture_filter="frame=|Duration:|Output|error",
     )
 
-    # Clean up palette file
-    palette_file.unlink(missing_ok=True)
-
     if not gif_file.exists():
         print(f"{RED}✗ Failed to create GIF{NC}")
         sys.exit(1)
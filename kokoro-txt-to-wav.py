@@ -23,34 +23,11 @@ import soundfile as sf
 # Model and voice files must already be cached (downloaded during setup.sh).
 os.environ['HF_HUB_OFFLINE'] = '1'
 
-from kokoro import KPipeline
-
-# Voice prefix -> language code mapping
-# American English voices start with a (af_, am_), British with b (bf_, bm_)
-LANG_CODE_MAP = {
-    'a': 'a',  # American English
-    'b': 'b',  # British English
-    'e': 'e',  # Spanish
-    'f': 'f',  # French
-    'h': 'h',  # Hindi
-    'i': 'i',  # Italian
-    'j': 'j',  # Japanese
-    'p': 'p',  # Portuguese
-    'z': 'z',  # Mandarin Chinese
-}
+from kokoro_utils import detect_lang_code, get_pipeline
 
 SAMPLE_RATE = 24000
 
 
-def detect_lang_code(voice: str) -> str:
-    """Detect language code from voice name prefix."""
-    if voice and len(voice) >= 2:
-        first_char = voice[0]
-        if first_char in LANG_CODE_MAP:
-            return LANG_CODE_MAP[first_char]
-    return 'a'
-
-
 def main():
     parser = argparse.ArgumentParser(
         description='Generate speech from text using official Kokoro TTS (hexgrad)')
@@ -77,21 +54,35 @@ def main():
         sys.exit(1)
 
     lang_code = args.lang if args.lang else detect_lang_code(args.voice)
-    pipeline = KPipeline(lang_code=lang_code)
-
-    # Generate and concatenate audio chunks
-    audio_chunks = []
-    generator = pipeline(text, voice=args.voice, speed=args.speed, split_pattern=r'\n+')
-    for i, (gs, ps, audio) in enumerate(generator):
-        audio_chunks.append(audio)
-
-    if not audio_chunks:
+    pipeline, voice_pack = get_pipeline(args.voice, lang_code)
+
+    # Generate audio chunks and stream each one straight into the WAV file,
+    # so long texts never hold every chunk plus a concatenated copy in memory.
+    # Write to a temp file (same extension, so soundfile picks the same
+    # format) and rename on success, so a failure never leaves a partial WAV.
+    root, ext = os.path.splitext(args.output)
+    tmp_output = f"{root}.{os.getpid()}.tmp{ext}"
+    frames_written = 0
+    generator = pipeline(text, voice=voice_pack, speed=args.speed, split_pattern=r'\n+')
+    try:
+        with sf.SoundFile(tmp_output, mode='w', samplerate=SAMPLE_RATE,
+                          channels=1, subtype='PCM_16') as out:
+            for gs, ps, audio in generator:
+                arr = audio.cpu().numpy() if hasattr(audio, 'cpu') else np.asarray(audio)
+                out.write(arr)
+                frames_written += len(arr)
+    except BaseException:
+        if os.path.exists(tmp_output):
+            os.remove(tmp_output)
+        raise
+
+    if frames_written == 0:
+        os.remove(tmp_output)
         print("Error: No audio generated", file=sys.stderr)
         sys.exit(1)
+    os.replace(tmp_output, args.output)
 
-    full_audio = np.concatenate(audio_chunks)
-    sf.write(args.output, full_audio, SAMPLE_RATE)
-    print(f"Generated {args.output} ({len(full_audio) / SAMPLE_RATE:.1f}s)")
+    print(f"Generated {args.output} ({frames_written / SAMPLE_RATE:.1f}s)")
 
 
 if __name__ == '__main__':
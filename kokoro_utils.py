@@ -0,0 +1,94 @@
+"""
+kokoro_utils.py — Kokoro TTS helpers shared by create-video.py and
+kokoro-txt-to-wav.py.
+
+Holds the voice-prefix → language-code mapping and a memoised pipeline
+loader, so a process builds each KPipeline (and loads each voice pack)
+only once no matter how many texts it synthesises.
+
+kokoro itself is imported lazily inside get_pipeline(), so importing this
+module is cheap and callers can set thread / offline environment variables
+before the native libraries load.
+"""
+
+import os
+import warnings
+from pathlib import Path
+
+# Voice prefix -> language code mapping
+# American English voices start with a (af_, am_), British with b (bf_, bm_)
+LANG_CODE_MAP = {
+    "a": "a",  # American English
+    "b": "b",  # British English
+    "e": "e",  # Spanish
+    "f": "f",  # French
+    "h": "h",  # Hindi
+    "i": "i",  # Italian
+    "j": "j",  # Japanese
+    "p": "p",  # Portuguese
+    "z": "z",  # Mandarin Chinese
+}
+
+# lang_code -> KPipeline, built on first use
+_pipelines: dict = {}
+
+
+def detect_lang_code(voice: str) -> str:
+    """Detect language code from voice name prefix."""
+    if voice and len(voice) >= 2:
+        first_char = voice[0]
+        if first_char in LANG_CODE_MAP:
+            return LANG_CODE_MAP[first_char]
+    return "a"
+
+
+def get_pipeline(
+    voice: str, lang_code: str | None = None, cache_dir: Path | None = None
+) -> tuple:
+    """Return ``(pipeline, voice_pack)`` for *voice*, building each only once.
+
+    *lang_code* overrides the code detected from the voice prefix.  When
+    *cache_dir* is given the voice pack is also persisted there (see
+    _load_voice), so later runs skip Kokoro's voice loading.  Raises
+    ImportError when the kokoro package isn't installed.
+    """
+    lang_code = lang_code or detect_lang_code(voice)
+    pipeline = _pipelines.get(lang_code)
+    if pipeline is None:
+        from kokoro import KPipeline  # type: ignore[import-untyped]
+
+        pipeline = KPipeline(lang_code=lang_code)
+        _pipelines[lang_code] = pipeline
+    return pipeline, _load_voice(pipeline, voice, lang_code, cache_dir)
+
+
+def _load_voice(pipeline, voice: str, lang_code: str, cache_dir: Path | None):
+    """Load *voice* into *pipeline*, via a memory-mapped .npy cache if enabled.
+
+    The first run saves the unpacked tensor as ``<voice>-<lang_code>.npy`` in
+    *cache_dir*; later runs map that file and wrap it with torch.from_numpy
+    (zero-copy) instead of deserialising Kokoro's .pt voice file.
+    """
+    # KPipeline caches loaded voices, so repeat calls don't touch the disk.
+    if cache_dir is None or voice in pipeline.voices:
+        return pipeline.load_voice(voice)
+
+    import numpy as np
+    import torch  # type: ignore[import-untyped]
+
+    cache_path = cache_dir / f"{Path(voice).name}-{lang_code}.npy"
+    if cache_path.exists():
+        with warnings.catch_warnings():
+            # The read-only mapping gives a non-writable tensor; it's only read.
+            warnings.simplefilter("ignore", UserWarning)
+            pack = torch.from_numpy(np.load(cache_path, mmap_mode="r"))
+        pipeline.voices[voice] = pack  # load_voice checks this dict first
+        return pack
+
+    pack = pipeline.load_voice(voice)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Write then rename, so parallel TTS workers never see a partial file.
+    tmp_path = cache_dir / f"{cache_path.stem}.{os.getpid()}.tmp.npy"
+    np.save(tmp_path, pack.cpu().numpy())
+    os.replace(tmp_path, cache_path)
+    return pack
@@ -51,7 +51,7 @@ info "Python: $(python --version) at $(which python)"
 # ── Step 3: Install official kokoro package ────────────────────────
 info "Installing official kokoro package (hexgrad) via pip..."
 pip install --upgrade pip --quiet
-pip install "kokoro>=0.9.4" soundfile "misaki[en]" --quiet
+pip install "kokoro>=0.9.4" soundfile "misaki[en]" mutagen --quiet
 info "kokoro installed: $(pip show kokoro | grep Version)"
 
 # ── Step 4: Smoke test ─────────────────────────────────────────────